@@ -1,457 +1,698 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
-from datetime import datetime, timedelta
-# Page configuration
-st.set_page_config(
-    page_title="San Jose Police Calls Analytics",
-    page_icon="🚔",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS for professional styling
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 0.5rem;
-    }
-    .sub-header {
-        font-size: 1.2rem;
-        color: #666;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .metric-container {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #1f77b4;
-    }
-    .stMetric {
-        background-color: white;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Header
-st.markdown('<div class="main-header">🚔 San Jose Police Calls Analytics Dashboard</div>', unsafe_allow_html=True)
-st.markdown('<div class="sub-header">Real-time insights for data-driven policing and resource optimization</div>', unsafe_allow_html=True)
-
-# Generate sample data (replace with actual database queries)
-@st.cache_data
-def generate_sample_data():
-    np.random.seed(42)
-    dates = pd.date_range(start='2024-01-01', end='2024-11-26', freq='D')
-    
-    # Monthly trends data
-    monthly_data = pd.DataFrame({
-        'month': pd.date_range(start='2024-01', end='2024-11', freq='MS'),
-        'calls': np.random.randint(2000, 4000, 11),
-        'severe_calls': np.random.randint(200, 600, 11)
-    })
-    monthly_data['running_total'] = monthly_data['calls'].cumsum()
-    monthly_data['pct_change'] = monthly_data['calls'].pct_change() * 100
-    
-    # Call types data
-    call_types = ['DISTURBANCE', 'TRAFFIC STOP', 'THEFT', 'ASSAULT', 'BURGLARY', 
-                  'WELFARE CHECK', 'SUSPICIOUS PERSON', 'VANDALISM', 'DOMESTIC', 'ALARM']
-    call_type_data = pd.DataFrame({
-        'call_type': call_types,
-        'total_calls': np.random.randint(500, 3000, len(call_types)),
-        'avg_priority': np.random.uniform(2.5, 4.5, len(call_types)),
-        'severe_count': np.random.randint(50, 500, len(call_types))
-    })
-    call_type_data = call_type_data.sort_values('total_calls', ascending=False)
-    
-    # Heat map data (hour x day)
-    hours = list(range(24))
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    heatmap_data = pd.DataFrame({
-        'hour': np.repeat(hours, len(days)),
-        'day': days * len(hours),
-        'calls': np.random.randint(20, 200, len(hours) * len(days))
-    })
-    
-    # Risk locations data
-    streets = ['Main St', 'Oak Ave', 'Park Blvd', 'Market St', 'First St',
-               'Second St', 'Third St', 'Santa Clara St', 'San Carlos St', 'San Fernando St',
-               'Almaden Blvd', 'The Alameda', 'Stevens Creek', 'Winchester Blvd', 'Bascom Ave']
-    suffixes = ['', 'N', 'S', 'E', 'W']
-    addresses = [f'{np.random.randint(100, 9999)} {street} {suffix}' 
-                 for street in streets
-                 for suffix in suffixes]
-    
-    # Ensure we have enough addresses
-    num_risk_locations = min(25, len(addresses))
-    risk_data = pd.DataFrame({
-        'address': np.random.choice(addresses, num_risk_locations, replace=False),
-        'risk_score': np.random.uniform(60, 95, num_risk_locations),
-        'total_calls': np.random.randint(50, 300, num_risk_locations),
-        'severe_calls': np.random.randint(10, 80, num_risk_locations),
-        'days_since_last': np.random.randint(0, 14, num_risk_locations)
-    })
-    risk_data = risk_data.sort_values('risk_score', ascending=False)
-    risk_data['risk_category'] = pd.cut(risk_data['risk_score'], 
-                                        bins=[0, 70, 80, 90, 100],
-                                        labels=['🟢 Lower Risk', '🟡 Moderate Risk', '🟠 High Risk', '🔴 Critical'])
-    
-    # Response time percentiles
-    response_data = pd.DataFrame({
-        'call_type': call_types[:8],
-        'p50': np.random.randint(5, 15, 8),
-        'p75': np.random.randint(10, 25, 8),
-        'p90': np.random.randint(15, 40, 8),
-        'p95': np.random.randint(20, 60, 8),
-        'total_calls': np.random.randint(100, 1000, 8)
-    })
-    
-    # Pareto data
-    pareto_data = pd.DataFrame({
-        'rank': list(range(1, 51)),
-        'address': [f'Location #{i}' for i in range(1, 51)],
-        'calls': np.sort(np.random.randint(50, 500, 50))[::-1],
-    })
-    pareto_data['cumulative_calls'] = pareto_data['calls'].cumsum()
-    pareto_data['cumulative_pct'] = (pareto_data['cumulative_calls'] / pareto_data['calls'].sum()) * 100
-    
-    return monthly_data, call_type_data, heatmap_data, risk_data, response_data, pareto_data
-
-monthly_data, call_type_data, heatmap_data, risk_data, response_data, pareto_data = generate_sample_data()
-
-# Sidebar filters
-st.sidebar.header("📊 Dashboard Filters")
-date_range = st.sidebar.date_input(
-    "Select Date Range",
-    value=(datetime(2024, 1, 1), datetime(2024, 11, 26)),
-    max_value=datetime(2024, 11, 26)
-)
-priority_filter = st.sidebar.multiselect(
-    "Priority Levels",
-    options=[1, 2, 3, 4, 5],
-    default=[1, 2, 3, 4, 5]
-)
-st.sidebar.markdown("---")
-st.sidebar.info("💡 *Tip*: Hover over charts for detailed information")
-
-# Key Metrics Row
-st.markdown("### 📈 Key Performance Indicators")
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    total_calls = monthly_data['calls'].sum()
-    st.metric("Total Calls", f"{total_calls:,}", delta=f"+{monthly_data['pct_change'].iloc[-1]:.1f}% MoM")
-
-with col2:
-    severe_calls = monthly_data['severe_calls'].sum()
-    severe_pct = (severe_calls / total_calls) * 100
-    st.metric("Severe Incidents", f"{severe_calls:,}", delta=f"{severe_pct:.1f}% of total")
-
-with col3:
-    avg_daily = total_calls / len(monthly_data)
-    st.metric("Avg Daily Calls", f"{avg_daily:.0f}", delta="📞")
-
-with col4:
-    top_risk_locations = len(risk_data[risk_data['risk_score'] > 85])
-    st.metric("High-Risk Locations", f"{top_risk_locations}", delta="🔴 Critical")
-
-st.markdown("---")
-
-# Visualization 1: Monthly Trends with Running Total
-st.markdown("### 📊 Visualization 1: Call Volume Trends & Running Totals")
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    fig1 = make_subplots(specs=[[{"secondary_y": True}]])
-    
-    fig1.add_trace(
-        go.Bar(x=monthly_data['month'], y=monthly_data['calls'], 
-               name='Monthly Calls', marker_color='lightblue'),
-        secondary_y=False
-    )
-    
-    fig1.add_trace(
-        go.Scatter(x=monthly_data['month'], y=monthly_data['running_total'],
-                   name='Running Total', mode='lines+markers',
-                   line=dict(color='darkblue', width=3)),
-        secondary_y=True
-    )
-    
-    fig1.update_layout(
-        title='Monthly Call Volume with Cumulative Trend',
-        hovermode='x unified',
-        height=400
-    )
-    fig1.update_xaxes(title_text="Month")
-    fig1.update_yaxes(title_text="Monthly Calls", secondary_y=False)
-    fig1.update_yaxes(title_text="Running Total", secondary_y=True)
-    
-    st.plotly_chart(fig1, use_container_width=True)
-
-with col2:
-    st.markdown("#### 📌 Key Insights")
-    st.markdown(f"""
-    - *Peak Month*: {monthly_data.loc[monthly_data['calls'].idxmax(), 'month'].strftime('%B %Y')}
-    - *Total Calls YTD*: {monthly_data['calls'].sum():,}
-    - *Avg Growth Rate*: {monthly_data['pct_change'].mean():.1f}% per month
-    - *Trend*: {'📈 Increasing' if monthly_data['pct_change'].iloc[-1] > 0 else '📉 Decreasing'}
-    """)
-    st.info("💡 Running totals help identify long-term capacity needs and seasonal patterns.")
-
-st.markdown("---")
-
-# Visualization 2: Call Type Distribution
-st.markdown("### 📊 Visualization 2: Call Type Analysis & Priority Distribution")
-
-fig2 = make_subplots(
-    rows=1, cols=2,
-    subplot_titles=('Top Call Types by Volume', 'Severe Incidents by Type'),
-    specs=[[{"type": "bar"}, {"type": "pie"}]]
-)
-
-fig2.add_trace(
-    go.Bar(x=call_type_data['total_calls'], y=call_type_data['call_type'],
-           orientation='h', marker_color='steelblue',
-           text=call_type_data['total_calls'], textposition='auto'),
-    row=1, col=1
-)
-
-fig2.add_trace(
-    go.Pie(labels=call_type_data['call_type'][:5], 
-           values=call_type_data['severe_count'][:5],
-           hole=0.4, marker_colors=px.colors.sequential.RdBu),
-    row=1, col=2
-)
-
-fig2.update_layout(height=450, showlegend=True)
-fig2.update_xaxes(title_text="Total Calls", row=1, col=1)
-st.plotly_chart(fig2, use_container_width=True)
-
-st.markdown("---")
-
-# Visualization 3: Heat Map - Hour x Day Analysis
-st.markdown("### 📊 Visualization 3: Call Volume Heat Map (Hour × Day)")
-
-heatmap_pivot = heatmap_data.pivot(index='hour', columns='day', values='calls')
-day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-heatmap_pivot = heatmap_pivot[day_order]
-
-fig3 = go.Figure(data=go.Heatmap(
-    z=heatmap_pivot.values,
-    x=heatmap_pivot.columns,
-    y=heatmap_pivot.index,
-    colorscale='YlOrRd',
-    text=heatmap_pivot.values,
-    texttemplate='%{text}',
-    textfont={"size": 10},
-    colorbar=dict(title="Calls")
-))
-
-fig3.update_layout(
-    title='Call Distribution by Hour and Day of Week',
-    xaxis_title='Day of Week',
-    yaxis_title='Hour of Day',
-    height=500
-)
-
-st.plotly_chart(fig3, use_container_width=True)
-
-col1, col2 = st.columns(2)
-with col1:
-    st.success("✅ *Peak Hours*: 10 PM - 2 AM on weekends show highest activity")
-with col2:
-    st.info("💡 *Low Activity*: Tuesday/Wednesday 2 AM - 6 AM ideal for maintenance")
-
-st.markdown("---")
-
-# Visualization 4: High-Risk Location Map
-st.markdown("### 📊 Visualization 4: Predictive Risk Analysis - Top 25 Locations")
-
-col1, col2 = st.columns([3, 1])
-
-with col1:
-    fig4 = go.Figure()
-    
-    colors = {'🔴 Critical': 'red', '🟠 High Risk': 'orange', 
-              '🟡 Moderate Risk': 'yellow', '🟢 Lower Risk': 'green'}
-    
-    for category in risk_data['risk_category'].unique():
-        data = risk_data[risk_data['risk_category'] == category]
-        fig4.add_trace(go.Scatter(
-            x=data.index,
-            y=data['risk_score'],
-            mode='markers',
-            name=category,
-            marker=dict(
-                size=data['total_calls'] / 5,
-                color=colors.get(category, 'blue'),
-                line=dict(width=2, color='white')
-            ),
-            text=data['address'],
-            hovertemplate='<b>%{text}</b><br>Risk Score: %{y:.1f}<br>Total Calls: ' +
-                         data['total_calls'].astype(str) + '<extra></extra>'
-        ))
-    
-    fig4.update_layout(
-        title='Risk Score Distribution (Size = Call Volume)',
-        xaxis_title='Location Rank',
-        yaxis_title='Risk Score',
-        height=400,
-        hovermode='closest'
-    )
-    
-    st.plotly_chart(fig4, use_container_width=True)
-
-with col2:
-    st.markdown("#### 🎯 Top 5 Risk Locations")
-    for idx, row in risk_data.head(5).iterrows():
-        st.markdown(f"""
-        *{row['address']}*  
-        Risk: {row['risk_score']:.1f} {row['risk_category']}  
-        Calls: {row['total_calls']} | Severe: {row['severe_calls']}
-        """)
-        st.markdown("---")
-
-st.markdown("---")
-
-# Visualization 5: Response Time Percentiles
-st.markdown("### 📊 Visualization 5: Response Time Analysis (Percentiles by Call Type)")
-
-fig5 = go.Figure()
-
-fig5.add_trace(go.Box(
-    x=response_data['call_type'],
-    q1=response_data['p50'],
-    median=response_data['p75'],
-    q3=response_data['p90'],
-    lowerfence=response_data['p50'] * 0.5,
-    upperfence=response_data['p95'],
-    name='Response Time Distribution',
-    marker_color='indianred'
-))
-
-fig5.add_hline(y=10, line_dash="dash", line_color="red", 
-               annotation_text="SLA Target (10 min)")
-
-fig5.update_layout(
-    title='Response Time Percentiles by Call Type (P50, P75, P90, P95)',
-    xaxis_title='Call Type',
-    yaxis_title='Response Time (minutes)',
-    height=450
-)
-
-st.plotly_chart(fig5, use_container_width=True)
-
-st.warning("⚠ Call types exceeding the 10-minute SLA target (red line) need process improvement")
-
-st.markdown("---")
-
-# Visualization 6: Pareto Analysis
-st.markdown("### 📊 Visualization 6: Pareto Analysis - Location Concentration")
-
-fig6 = make_subplots(specs=[[{"secondary_y": True}]])
-
-fig6.add_trace(
-    go.Bar(x=pareto_data['rank'][:30], y=pareto_data['calls'][:30],
-           name='Calls per Location', marker_color='skyblue'),
-    secondary_y=False
-)
-
-fig6.add_trace(
-    go.Scatter(x=pareto_data['rank'][:30], y=pareto_data['cumulative_pct'][:30],
-               name='Cumulative %', mode='lines+markers',
-               line=dict(color='red', width=3),
-               marker=dict(size=8)),
-    secondary_y=True
-)
-
-fig6.add_hline(y=80, line_dash="dash", line_color="green",
-               annotation_text="80% Threshold", secondary_y=True)
-
-fig6.update_layout(
-    title='80/20 Rule: Do Top 20% of Locations Generate 80% of Calls?',
-    hovermode='x unified',
-    height=450
-)
-fig6.update_xaxes(title_text="Location Rank")
-fig6.update_yaxes(title_text="Number of Calls", secondary_y=False)
-fig6.update_yaxes(title_text="Cumulative Percentage", secondary_y=True)
-
-st.plotly_chart(fig6, use_container_width=True)
-
-# Calculate 80/20 metrics
-locations_for_80pct = pareto_data[pareto_data['cumulative_pct'] <= 80].shape[0]
-pct_locations_for_80pct = (locations_for_80pct / len(pareto_data)) * 100
-
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("Locations for 80% of Calls", f"{locations_for_80pct}", 
-              delta=f"{pct_locations_for_80pct:.1f}% of total locations")
-with col2:
-    st.metric("Pareto Efficiency", f"{100 - pct_locations_for_80pct:.1f}%",
-              delta="Focus area reduction")
-with col3:
-    st.success("✅ Validates 80/20 rule - focus on top locations for maximum impact")
-
-st.markdown("---")
-
-# Visualization 7: Incident Chain Analysis
-st.markdown("### 📊 Visualization 7: Incident Chains - Escalating Situations")
-
-# Generate sample incident chain data
-chain_data = pd.DataFrame({
-    'address': risk_data['address'][:10],
-    'incidents_24h': np.random.randint(3, 8, 10),
-    'chain_length': np.random.randint(2, 5, 10),
-    'highest_priority': np.random.randint(1, 3, 10)
-})
-
-fig7 = go.Figure()
-
-fig7.add_trace(go.Scatter(
-    x=chain_data['incidents_24h'],
-    y=chain_data['chain_length'],
-    mode='markers+text',
-    marker=dict(
-        size=chain_data['highest_priority'] * 20,
-        color=chain_data['highest_priority'],
-        colorscale='Reds',
-        showscale=True,
-        colorbar=dict(title="Priority"),
-        line=dict(width=2, color='white')
-    ),
-    text=chain_data['address'].str[:15] + '...',
-    textposition='top center',
-    hovertemplate='<b>%{text}</b><br>24h Incidents: %{x}<br>Chain Length: %{y}<extra></extra>'
-))
-
-fig7.update_layout(
-    title='Incident Chains: Locations with Cascading Problems (24-hour windows)',
-    xaxis_title='Incidents in 24 Hours',
-    yaxis_title='Chain Length (sequential incidents)',
-    height=450
-)
-
-st.plotly_chart(fig7, use_container_width=True)
-
-st.error("🚨 *Action Required*: Locations with 5+ incidents in 24 hours need immediate intervention")
-
-# Footer
-st.markdown("---")
-st.markdown("""
-<div style='text-align: center; color: #666; padding: 2rem;'>
-    <p><strong>San Jose Police Department - Analytics Dashboard</strong></p>
-    <p>Data-driven insights for proactive policing and community safety</p>
-    <p style='font-size: 0.8rem;'>Last Updated: November 26, 2024 | Refresh rate: Real-time</p>
-</div>
-""", unsafe_allow_html=True)
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import numpy as np
+from numpy.random import default_rng
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+try:
+    # Optional: LTTB-downsamples long line/bar series so the browser gets
+    # O(pixels) points instead of the full series.
+    from plotly_resampler import FigureResampler
+except ImportError:
+    FigureResampler = None
+
+from database import (
+    CACHE_STATS,
+    get_database_connection,
+    load_all,
+    load_monthly_data,
+    load_call_type_data,
+    load_heatmap_data,
+    load_risk_data,
+    load_response_time_data,
+    load_pareto_data,
+    load_incident_chain_data,
+)
+# Page configuration
+st.set_page_config(
+    page_title="San Jose Police Calls Analytics",
+    page_icon="🚔",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS and header, consolidated into one constant so a single
+# st.markdown call (one markdown-parser pass, one frontend element) covers
+# the whole static block on each rerun.
+STATIC_HEAD = """
+<style>
+    .main-header {
+        font-size: 2.5rem;
+        font-weight: bold;
+        color: #1f77b4;
+        text-align: center;
+        margin-bottom: 0.5rem;
+    }
+    .sub-header {
+        font-size: 1.2rem;
+        color: #666;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .metric-container {
+        background-color: #f0f2f6;
+        padding: 1rem;
+        border-radius: 0.5rem;
+        border-left: 4px solid #1f77b4;
+    }
+    .stMetric {
+        background-color: white;
+        padding: 1rem;
+        border-radius: 0.5rem;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    }
+</style>
+<div class="main-header">🚔 San Jose Police Calls Analytics Dashboard</div>
+<div class="sub-header">Real-time insights for data-driven policing and resource optimization</div>
+"""
+
+st.markdown(STATIC_HEAD, unsafe_allow_html=True)
+
+# Shared constants, defined once at module scope instead of rebuilt inside
+# the render path. Tuples keep them immutable and hashable for cache keys.
+DAY_ORDER = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+CALL_TYPES = ('DISTURBANCE', 'TRAFFIC STOP', 'THEFT', 'ASSAULT', 'BURGLARY',
+              'WELFARE CHECK', 'SUSPICIOUS PERSON', 'VANDALISM', 'DOMESTIC', 'ALARM')
+STREETS = ('Main St', 'Oak Ave', 'Park Blvd', 'Market St', 'First St',
+           'Second St', 'Third St', 'Santa Clara St', 'San Carlos St', 'San Fernando St',
+           'Almaden Blvd', 'The Alameda', 'Stevens Creek', 'Winchester Blvd', 'Bascom Ave')
+SUFFIXES = ('', 'N', 'S', 'E', 'W')
+# Server-side cap for scatter traces: past this, extra markers only add
+# payload and overdraw, so send the highest-risk slice instead of everything.
+MAX_PLOT_POINTS = 2000
+# Series length at which the trend/Pareto figures switch to resampled
+# rendering (when plotly-resampler is installed).
+RESAMPLE_THRESHOLD = 1000
+
+def maybe_resample(fig, n_points):
+    """Wrap a figure in FigureResampler once its series outgrow the viewport.
+
+    Inside Streamlit only the initial LTTB downsample applies (zoom-driven
+    reloads need a callback host), which is still the payload win that
+    matters here.
+    """
+    if FigureResampler is not None and n_points > RESAMPLE_THRESHOLD:
+        return FigureResampler(fig, default_n_shown_samples=2000)
+    return fig
+RISK_LABELS = np.array(['🟢 Lower Risk', '🟡 Moderate Risk', '🟠 High Risk', '🔴 Critical'])
+RISK_COLORS = {'🔴 Critical': 'red', '🟠 High Risk': 'orange',
+               '🟡 Moderate Risk': 'yellow', '🟢 Lower Risk': 'green'}
+
+def pareto_stats(calls):
+    """Cumulative totals, percentages and the 80% cut for descending call counts.
+
+    Array-in/arrays-out on purpose: the whole block is a drop-in candidate
+    for numba's @njit(cache=True) if location counts ever make it hot, but
+    at dashboard sizes these three NumPy calls are already single C loops.
+    """
+    cumulative = np.cumsum(calls)
+    if cumulative.size == 0:
+        return cumulative, cumulative.astype(np.float64), 0
+    pct = cumulative * (100.0 / cumulative[-1])
+    threshold_idx = int(np.searchsorted(pct, 80.0, side='right'))
+    return cumulative, pct, threshold_idx
+
+# Generate sample data (replace with actual database queries)
+@st.cache_data(ttl=3600, show_spinner=False)
+def generate_sample_data():
+    # Single PCG64 generator instead of the legacy global-seed Mersenne Twister:
+    # fewer Python/C crossings and a faster bit stream on the cold-start run.
+    rng = default_rng(42)
+
+    # Monthly trends data
+    monthly_data = pd.DataFrame({
+        'month': pd.date_range(start='2024-01', end='2024-11', freq='MS'),
+        'calls': rng.integers(2000, 4000, 11),
+        'severe_calls': rng.integers(200, 600, 11)
+    })
+    monthly_data['running_total'] = monthly_data['calls'].cumsum()
+    monthly_data['pct_change'] = monthly_data['calls'].pct_change() * 100
+    # Days covered by the sample period (Jan 1 – Nov 26), matching the
+    # n_days column the database loader derives from distinct call dates.
+    monthly_data['n_days'] = (datetime(2024, 11, 26) - datetime(2024, 1, 1)).days + 1
+
+    # Call types data
+    call_type_data = pd.DataFrame({
+        'call_type': CALL_TYPES,
+        'total_calls': rng.integers(500, 3000, len(CALL_TYPES)),
+        'avg_priority': rng.uniform(2.5, 4.5, len(CALL_TYPES)),
+        'severe_count': rng.integers(50, 500, len(CALL_TYPES))
+    })
+    call_type_data = call_type_data.sort_values('total_calls', ascending=False)
+
+    # Risk locations data
+    house_numbers = rng.integers(100, 9999, len(STREETS) * len(SUFFIXES)).astype('U4')
+    streets_rep = np.repeat(STREETS, len(SUFFIXES))
+    suffixes_tiled = np.tile(SUFFIXES, len(STREETS))
+    addresses = np.char.add(
+        np.char.add(np.char.add(house_numbers, ' '), streets_rep),
+        np.char.add(' ', suffixes_tiled))
+
+    # Ensure we have enough addresses
+    num_risk_locations = min(25, len(addresses))
+    risk_data = pd.DataFrame({
+        'address': rng.choice(addresses, num_risk_locations, replace=False),
+        'risk_score': rng.uniform(60, 95, num_risk_locations),
+        'total_calls': rng.integers(50, 300, num_risk_locations),
+        'severe_calls': rng.integers(10, 80, num_risk_locations),
+        'days_since_last': rng.integers(0, 14, num_risk_locations)
+    })
+    risk_data = risk_data.sort_values('risk_score', ascending=False)
+    # np.digitize is a single C binary-search loop; pd.cut would build a
+    # Categorical and IntervalIndex for the same four buckets.
+    risk_data['risk_category'] = RISK_LABELS[np.digitize(risk_data['risk_score'].to_numpy(), [70, 80, 90])]
+
+    # Response time percentiles: one batched draw per percentile band keeps
+    # the RNG in a single vectorized call per column.
+    response_data = pd.DataFrame({
+        'call_type': CALL_TYPES[:8],
+        'p50': rng.integers(5, 15, 8),
+        'p75': rng.integers(10, 25, 8),
+        'p90': rng.integers(15, 40, 8),
+        'p95': rng.integers(20, 60, 8),
+        'total_calls': rng.integers(100, 1000, 8)
+    })
+
+    # Pareto data
+    calls = np.sort(rng.integers(50, 500, 50))[::-1]
+    cumulative_calls, cumulative_pct, _ = pareto_stats(calls)
+    pareto_data = pd.DataFrame({
+        'rank': list(range(1, 51)),
+        'address': [f'Location #{i}' for i in range(1, 51)],
+        'calls': calls,
+        'cumulative_calls': cumulative_calls,
+        'cumulative_pct': cumulative_pct,
+    })
+
+    # Downcast: every value here fits comfortably in 32 bits, and Plotly's
+    # JSON encoder moves half the bytes.
+    for df in (monthly_data, call_type_data, risk_data, response_data, pareto_data):
+        for col in df.select_dtypes('int64'):
+            df[col] = df[col].astype(np.int32)
+        for col in df.select_dtypes('float64'):
+            df[col] = df[col].astype(np.float32)
+
+    return monthly_data, call_type_data, risk_data, response_data, pareto_data
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_heatmap_matrix():
+    """Sample hour-by-day call counts, generated directly in plot shape.
+
+    Drawing the (24, 7) matrix in one call skips the long-form DataFrame,
+    pivot and column reorder the chart would otherwise immediately undo.
+    """
+    z = default_rng(42).integers(20, 200, size=(24, 7), dtype=np.int16)
+    return z, DAY_ORDER, tuple(range(24))
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_kpis(monthly_data, risk_data):
+    """Scalar reductions for the KPI row and insight panels, computed once.
+
+    Each .sum()/.idxmax()/.mean() is cheap alone but pays pandas indexer
+    overhead on every rerun; caching the plain-Python results removes all
+    of that from the render path.
+    """
+    if monthly_data.empty:
+        # Defensive twin of the page-level empty-range guard: zeroed
+        # scalars instead of idxmax/iloc raising on an empty frame.
+        return {'total_calls': 0, 'severe_calls': 0, 'severe_pct': 0.0,
+                'n_months': 0, 'avg_daily': 0.0, 'peak_month': None,
+                'mom_pct': 0.0, 'avg_growth': 0.0,
+                'high_risk_locations': int((risk_data['risk_score'] > 85).sum())}
+    total_calls = int(monthly_data['calls'].sum())
+    severe_calls = int(monthly_data['severe_calls'].sum())
+    return {
+        'total_calls': total_calls,
+        'severe_calls': severe_calls,
+        'severe_pct': severe_calls / total_calls * 100,
+        'n_months': len(monthly_data),
+        'avg_daily': total_calls / max(int(monthly_data['n_days'].iloc[0]), 1),
+        'peak_month': monthly_data.loc[monthly_data['calls'].idxmax(), 'month'],
+        'mom_pct': float(monthly_data['pct_change'].iloc[-1]),
+        'avg_growth': float(monthly_data['pct_change'].mean()),
+        'high_risk_locations': int((risk_data['risk_score'] > 85).sum()),
+    }
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_chain_data(risk_data):
+    """Sample incident chain data derived from the top risk locations."""
+    rng = default_rng(42)
+    return pd.DataFrame({
+        'address': risk_data['address'][:10],
+        'incidents_24h': rng.integers(3, 8, 10),
+        'chain_length': rng.integers(2, 5, 10),
+        'highest_priority': rng.integers(1, 3, 10)
+    })
+
+def dual_axis_fig(title, x_title, y_title, y2_title, height):
+    """Figure with a hand-built secondary y-axis.
+
+    Equivalent to make_subplots(specs=[[{"secondary_y": True}]]) but skips
+    the subplot factory's schema resolution; traces opt in with yaxis='y2'.
+    """
+    return go.Figure(layout=go.Layout(
+        title=title,
+        hovermode='x unified',
+        height=height,
+        xaxis=dict(title=x_title),
+        yaxis=dict(title=y_title),
+        yaxis2=dict(title=y2_title, overlaying='y', side='right'),
+    ))
+
+# Figure builders. Plotly figure construction (validator walks, JSON prep) is
+# the dominant Python-side cost per rerun, so each builder is cached and only
+# re-executes when its input data actually changes. cache_data (not
+# cache_resource) hands each session its own copy, so one session mutating a
+# figure can't corrupt another's; the explicit hash_funcs entry hashes frames
+# by content in one pass instead of Streamlit's slower generic walk.
+_FIG_CACHE = dict(
+    ttl=3600,
+    show_spinner=False,
+    hash_funcs={pd.DataFrame:
+                lambda df: pd.util.hash_pandas_object(df, index=True).values.tobytes()},
+)
+@st.cache_data(**_FIG_CACHE)
+def build_fig1(monthly_data):
+    fig1 = dual_axis_fig('Monthly Call Volume with Cumulative Trend',
+                         'Month', 'Monthly Calls', 'Running Total', height=400)
+
+    fig1.add_trace(
+        go.Bar(x=monthly_data['month'].to_numpy(), y=monthly_data['calls'].to_numpy(),
+               name='Monthly Calls', marker_color='lightblue')
+    )
+
+    fig1.add_trace(
+        go.Scatter(x=monthly_data['month'].to_numpy(), y=monthly_data['running_total'].to_numpy(),
+                   name='Running Total', mode='lines+markers',
+                   line=dict(color='darkblue', width=3), yaxis='y2')
+    )
+    return maybe_resample(fig1, len(monthly_data))
+
+@st.cache_data(**_FIG_CACHE)
+def build_fig2(call_type_data):
+    fig2 = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('Top Call Types by Volume', 'Severe Incidents by Type'),
+        specs=[[{"type": "bar"}, {"type": "pie"}]]
+    )
+
+    fig2.add_trace(
+        go.Bar(x=call_type_data['total_calls'].to_numpy(), y=call_type_data['call_type'].to_numpy(),
+               orientation='h', marker_color='steelblue',
+               text=call_type_data['total_calls'].to_numpy(), textposition='auto'),
+        row=1, col=1
+    )
+
+    fig2.add_trace(
+        go.Pie(labels=call_type_data['call_type'].to_numpy()[:5],
+               values=call_type_data['severe_count'].to_numpy()[:5],
+               hole=0.4, marker_colors=px.colors.sequential.RdBu),
+        row=1, col=2
+    )
+
+    fig2.update_layout(height=450, showlegend=True)
+    fig2.update_xaxes(title_text="Total Calls", row=1, col=1)
+    return fig2
+
+@st.cache_data(**_FIG_CACHE)
+def build_fig3(z, days, hours):
+    fig3 = go.Figure(data=go.Heatmap(
+        z=z,
+        x=days,
+        y=hours,
+        colorscale='YlOrRd',
+        # Preformatted strings: the '%{text}' template is a straight
+        # passthrough instead of per-cell number formatting in the browser.
+        # Counts of 1000+ compress to '1.2k' to keep the cells legible.
+        text=np.where(z >= 1000,
+                      np.char.add(np.char.mod('%.1f', z / 1000), 'k'),
+                      np.char.mod('%d', z)),
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        colorbar=dict(title="Calls")
+    ))
+
+    fig3.update_layout(
+        title='Call Distribution by Hour and Day of Week',
+        xaxis_title='Day of Week',
+        yaxis_title='Hour of Day',
+        height=500
+    )
+    return fig3
+
+@st.cache_data(**_FIG_CACHE)
+def build_fig4(risk_data):
+    fig4 = go.Figure()
+
+    # risk_data arrives sorted by risk_score, so the cap keeps the points
+    # that matter once real query volumes replace the 25-row sample.
+    if len(risk_data) > MAX_PLOT_POINTS:
+        risk_data = risk_data.head(MAX_PLOT_POINTS)
+
+    # One trace with a per-point color array instead of one trace per
+    # category: a single validator pass and a single JSON payload.
+    fig4.add_trace(go.Scattergl(
+        x=risk_data.index.to_numpy(),
+        y=risk_data['risk_score'].to_numpy(),
+        mode='markers',
+        showlegend=False,
+        marker=dict(
+            size=risk_data['total_calls'].to_numpy() / 5,
+            color=risk_data['risk_category'].map(RISK_COLORS).to_numpy(),
+            line=dict(width=2, color='white')
+        ),
+        text=risk_data['address'].to_numpy(),
+        customdata=risk_data[['total_calls', 'risk_category']].to_numpy(),
+        hovertemplate='<b>%{text}</b><br>%{customdata[1]}<br>'
+                      'Risk Score: %{y:.1f}<br>'
+                      'Total Calls: %{customdata[0]}<extra></extra>'
+    ))
+
+    # Empty stub traces give each category a legend entry.
+    for category, color in RISK_COLORS.items():
+        fig4.add_trace(go.Scatter(x=[None], y=[None], mode='markers',
+                                  marker=dict(size=10, color=color),
+                                  name=category))
+
+    fig4.update_layout(
+        title='Risk Score Distribution (Size = Call Volume)',
+        xaxis_title='Location Rank',
+        yaxis_title='Risk Score',
+        height=400,
+        hovermode='closest'
+    )
+    return fig4
+
+@st.cache_data(**_FIG_CACHE)
+def build_fig5(response_data):
+    fig5 = go.Figure()
+
+    fig5.add_trace(go.Box(
+        x=response_data['call_type'].to_numpy(),
+        q1=response_data['p50'].to_numpy(),
+        median=response_data['p75'].to_numpy(),
+        q3=response_data['p90'].to_numpy(),
+        lowerfence=response_data['p50'].to_numpy() * 0.5,
+        upperfence=response_data['p95'].to_numpy(),
+        name='Response Time Distribution',
+        marker_color='indianred'
+    ))
+
+    fig5.add_hline(y=10, line_dash="dash", line_color="red",
+                   annotation_text="SLA Target (10 min)")
+
+    fig5.update_layout(
+        title='Response Time Percentiles by Call Type (P50, P75, P90, P95)',
+        xaxis_title='Call Type',
+        yaxis_title='Response Time (minutes)',
+        height=450
+    )
+    return fig5
+
+@st.cache_data(**_FIG_CACHE)
+def build_fig6(pareto_data):
+    fig6 = dual_axis_fig('80/20 Rule: Do Top 20% of Locations Generate 80% of Calls?',
+                         'Location Rank', 'Number of Calls', 'Cumulative Percentage',
+                         height=450)
+
+    fig6.add_trace(
+        go.Bar(x=pareto_data['rank'].to_numpy()[:30], y=pareto_data['calls'].to_numpy()[:30],
+               name='Calls per Location', marker_color='skyblue')
+    )
+
+    fig6.add_trace(
+        go.Scatter(x=pareto_data['rank'].to_numpy()[:30], y=pareto_data['cumulative_pct'].to_numpy()[:30],
+                   name='Cumulative %', mode='lines+markers',
+                   line=dict(color='red', width=3),
+                   marker=dict(size=8), yaxis='y2')
+    )
+
+    # add_hline's secondary_y handling needs the subplot grid, so pin the
+    # threshold line to yaxis2 with an explicit shape + annotation.
+    fig6.add_shape(type='line', xref='paper', x0=0, x1=1, yref='y2', y0=80, y1=80,
+                   line=dict(dash='dash', color='green'))
+    fig6.add_annotation(xref='paper', x=1, yref='y2', y=80, text='80% Threshold',
+                        showarrow=False, yshift=8)
+    return maybe_resample(fig6, len(pareto_data))
+
+@st.cache_data(**_FIG_CACHE)
+def build_fig7(chain_data):
+    fig7 = go.Figure()
+
+    # Fixed-width U15 truncates each address in C instead of building a
+    # fresh object Series of Python strings every rerun.
+    labels = np.char.add(chain_data['address'].to_numpy(dtype='U15'), '...')
+    fig7.add_trace(go.Scattergl(
+        x=chain_data['incidents_24h'].to_numpy(),
+        y=chain_data['chain_length'].to_numpy(),
+        mode='markers',
+        marker=dict(
+            size=chain_data['highest_priority'].to_numpy() * 20,
+            color=chain_data['highest_priority'].to_numpy(),
+            colorscale='Reds',
+            showscale=True,
+            colorbar=dict(title="Priority"),
+            line=dict(width=2, color='white')
+        ),
+        text=labels,
+        hovertemplate='<b>%{text}</b><br>24h Incidents: %{x}<br>Chain Length: %{y}<extra></extra>'
+    ))
+
+    # Scattergl does not support textposition='top center'; keep the labels
+    # as layout annotations instead of a text trace.
+    for label, x, y in zip(labels, chain_data['incidents_24h'], chain_data['chain_length']):
+        fig7.add_annotation(x=x, y=y, text=label, yshift=18, showarrow=False,
+                            font=dict(size=10))
+
+    fig7.update_layout(
+        title='Incident Chains: Locations with Cascading Problems (24-hour windows)',
+        xaxis_title='Incidents in 24 Hours',
+        yaxis_title='Chain Length (sequential incidents)',
+        height=450
+    )
+    return fig7
+
+# Sidebar filters
+st.sidebar.header("📊 Dashboard Filters")
+date_range = st.sidebar.date_input(
+    "Select Date Range",
+    value=(datetime(2024, 1, 1), datetime(2024, 11, 26)),
+    max_value=datetime(2024, 11, 26)
+)
+priority_filter = st.sidebar.multiselect(
+    "Priority Levels",
+    options=[1, 2, 3, 4, 5],
+    default=[1, 2, 3, 4, 5]
+)
+if st.sidebar.button("🔄 Refresh Data"):
+    # Evict only the query-layer caches; the pooled engine, the version
+    # probe and the content-keyed figure caches stay warm.
+    for loader in (load_all, load_monthly_data, load_call_type_data,
+                   load_heatmap_data, load_risk_data, load_response_time_data,
+                   load_pareto_data, load_incident_chain_data):
+        loader.clear()
+    st.rerun()
+st.sidebar.divider()
+with st.sidebar.expander("🗄️ Cache stats"):
+    if not CACHE_STATS:
+        st.caption("No loads recorded yet.")
+    for loader_name, s in CACHE_STATS.items():
+        st.caption(f"{loader_name}: {s['hits']} hits / {s['misses']} misses "
+                   f"· last {s['last_exec_ms']:.0f} ms")
+st.sidebar.info("💡 *Tip*: Hover over charts for detailed information")
+
+# Data: live queries when a database is configured, sample data otherwise.
+def _norm(d):
+    """Collapse datetime vs date so loader cache keys match across reruns."""
+    return d.date() if isinstance(d, datetime) else d
+
+if isinstance(date_range, tuple) and len(date_range) == 2:
+    start_date, end_date = date_range
+else:
+    start_date, end_date = datetime(2024, 1, 1), datetime(2024, 11, 26)
+start_date, end_date = _norm(start_date), _norm(end_date)
+
+engine = get_database_connection()
+if engine is not None:
+    with st.spinner('Loading data...'):
+        try:
+            # Preferred path: one scan of police_calls into a temporary
+            # table, all seven aggregates off that on one connection.
+            data = load_all(engine, start_date, end_date)
+            monthly_data = data['monthly']
+            call_type_data = data['call_types']
+            heatmap_z, heatmap_days, heatmap_hours = data['heatmap']
+            risk_data = data['risk']
+            response_data = data['response']
+            pareto_data = data['pareto']
+            chain_data = data['chains']
+        except Exception:
+            # No CREATE TEMPORARY TABLE privilege (or engine quirk): fan the
+            # standalone loaders out across pooled connections instead.
+            # pymysql releases the GIL during socket I/O, so wall time is
+            # roughly the slowest query rather than the sum of seven.
+            loaders = [load_monthly_data, load_call_type_data, load_heatmap_data,
+                       load_risk_data, load_response_time_data, load_pareto_data,
+                       load_incident_chain_data]
+            with ThreadPoolExecutor(max_workers=len(loaders)) as pool:
+                futures = [pool.submit(fn, engine, start_date, end_date)
+                           for fn in loaders]
+                (monthly_data, call_type_data,
+                 (heatmap_z, heatmap_days, heatmap_hours),
+                 risk_data, response_data, pareto_data,
+                 chain_data) = [f.result() for f in futures]
+else:
+    monthly_data, call_type_data, risk_data, response_data, pareto_data = generate_sample_data()
+    heatmap_z, heatmap_days, heatmap_hours = get_heatmap_matrix()
+    chain_data = get_chain_data(risk_data)
+
+# A range with no rows is ordinary picker input on the database path
+# (the sample generators can never be empty); stop before the KPI and
+# chart code runs reductions on empty frames.
+if monthly_data.empty:
+    st.warning("⚠️ No calls found for the selected date range. "
+               "Try widening the dates in the sidebar.")
+    st.stop()
+
+# Key Metrics Row
+st.markdown("### 📈 Key Performance Indicators")
+col1, col2, col3, col4 = st.columns(4)
+
+kpis = get_kpis(monthly_data, risk_data)
+
+with col1:
+    st.metric("Total Calls", f"{kpis['total_calls']:,}", delta=f"+{kpis['mom_pct']:.1f}% MoM")
+
+with col2:
+    # These deltas are shares/labels, not directional changes, so turn the
+    # red/green coloring off rather than let st.metric guess a direction.
+    st.metric("Severe Incidents", f"{kpis['severe_calls']:,}",
+              delta=f"{kpis['severe_pct']:.1f}% of total", delta_color="off")
+
+with col3:
+    st.metric("Avg Daily Calls", f"{kpis['avg_daily']:.0f}", delta="📞", delta_color="off")
+
+with col4:
+    st.metric("High-Risk Locations", f"{kpis['high_risk_locations']}",
+              delta="🔴 Critical", delta_color="off")
+
+st.divider()
+
+# One tab per visualization. st.tabs renders children eagerly — all seven
+# figures are still built and serialized on every rerun — but the browser
+# only lays out and draws the visible tab's chart, so initial paint and
+# interaction stay responsive. Skipping the off-screen build work would
+# need per-tab state, not this layout.
+(tab_trends, tab_types, tab_heatmap, tab_risk,
+ tab_response, tab_pareto, tab_chains) = st.tabs([
+    'Trends', 'Call Types', 'Heat Map', 'Risk Locations',
+    'Response Times', 'Pareto', 'Incident Chains'
+])
+
+# Visualization 1: Monthly Trends with Running Total
+with tab_trends:
+    st.markdown("### 📊 Visualization 1: Call Volume Trends & Running Totals")
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.plotly_chart(build_fig1(monthly_data), use_container_width=True)
+
+    with col2:
+        st.markdown("#### 📌 Key Insights")
+        st.markdown(f"""
+        - *Peak Month*: {kpis['peak_month'].strftime('%B %Y')}
+        - *Total Calls YTD*: {kpis['total_calls']:,}
+        - *Avg Growth Rate*: {kpis['avg_growth']:.1f}% per month
+        - *Trend*: {'📈 Increasing' if kpis['mom_pct'] > 0 else '📉 Decreasing'}
+        """)
+        st.info("💡 Running totals help identify long-term capacity needs and seasonal patterns.")
+
+# Visualization 2: Call Type Distribution
+with tab_types:
+    st.markdown("### 📊 Visualization 2: Call Type Analysis & Priority Distribution")
+
+    st.plotly_chart(build_fig2(call_type_data), use_container_width=True)
+
+# Visualization 3: Heat Map - Hour x Day Analysis
+with tab_heatmap:
+    st.markdown("### 📊 Visualization 3: Call Volume Heat Map (Hour × Day)")
+
+    st.plotly_chart(build_fig3(heatmap_z, tuple(heatmap_days), tuple(heatmap_hours)),
+                    use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.success("✅ *Peak Hours*: 10 PM - 2 AM on weekends show highest activity")
+    with col2:
+        st.info("💡 *Low Activity*: Tuesday/Wednesday 2 AM - 6 AM ideal for maintenance")
+
+# Visualization 4: High-Risk Location Map
+with tab_risk:
+    st.markdown("### 📊 Visualization 4: Predictive Risk Analysis - Top 25 Locations")
+
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        st.plotly_chart(build_fig4(risk_data), use_container_width=True)
+
+    with col2:
+        st.markdown("#### 🎯 Top 5 Risk Locations")
+        top5 = risk_data.head(5)[['address', 'risk_score', 'total_calls',
+                                  'severe_calls', 'risk_category']]
+        for address, score, calls, severe, category in top5.itertuples(index=False):
+            st.markdown(f"""
+            *{address}*  
+            Risk: {score:.1f} {category}  
+            Calls: {calls} | Severe: {severe}
+            """)
+            st.divider()
+
+# Visualization 5: Response Time Percentiles
+with tab_response:
+    st.markdown("### 📊 Visualization 5: Response Time Analysis (Percentiles by Call Type)")
+
+    st.plotly_chart(build_fig5(response_data), use_container_width=True)
+
+    st.warning("⚠ Call types exceeding the 10-minute SLA target (red line) need process improvement")
+
+# Visualization 6: Pareto Analysis
+with tab_pareto:
+    st.markdown("### 📊 Visualization 6: Pareto Analysis - Location Concentration")
+
+    st.plotly_chart(build_fig6(pareto_data), use_container_width=True)
+
+    # Calculate 80/20 metrics off the frame's cumulative_pct: on the
+    # database path that column normalizes over all addresses, not just
+    # the top-50 rows returned, so recomputing from 'calls' here would
+    # overstate concentration and disagree with the chart's 80% line.
+    locations_for_80pct = int(np.searchsorted(
+        pareto_data['cumulative_pct'].to_numpy(), 80.0, side='right'))
+    pct_locations_for_80pct = (locations_for_80pct / len(pareto_data)) * 100
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Locations for 80% of Calls", f"{locations_for_80pct}", 
+                  delta=f"{pct_locations_for_80pct:.1f}% of total locations")
+    with col2:
+        st.metric("Pareto Efficiency", f"{100 - pct_locations_for_80pct:.1f}%",
+                  delta="Focus area reduction")
+    with col3:
+        st.success("✅ Validates 80/20 rule - focus on top locations for maximum impact")
+
+# Visualization 7: Incident Chain Analysis
+with tab_chains:
+    st.markdown("### 📊 Visualization 7: Incident Chains - Escalating Situations")
+
+    st.plotly_chart(build_fig7(chain_data), use_container_width=True)
+
+    st.error("🚨 *Action Required*: Locations with 5+ incidents in 24 hours need immediate intervention")
+
+# Footer: a caption instead of an HTML block, so the front-end diffs a
+# plain text node rather than re-parsing markup on every rerun.
+st.divider()
+st.caption("San Jose Police Department — Analytics Dashboard · "
+           f"Last Updated {datetime.now():%b %d, %Y %I:%M %p}")
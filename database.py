@@ -0,0 +1,483 @@
+"""MySQL data access for the San Jose Police Calls dashboard.
+
+One dataset per visualization, all reading the police_calls table
+(call_datetime, priority, call_type, address, dispatch_datetime).
+app.py falls back to its sample generators when no database is
+configured, so every loader returns frames shaped exactly like the
+sample equivalents.
+
+The preferred entry point is load_all, which materializes the
+date-filtered rows into a temporary table once and runs the seven
+aggregates against it on a single connection — the base table is
+scanned once instead of seven times. The standalone load_* functions
+run the same SQL directly against police_calls and remain as the
+fallback when temporary tables aren't available.
+
+Severe incidents are priority 1-2 throughout.
+"""
+
+import functools
+import os
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+import streamlit as st
+
+try:
+    # Optional: decodes result sets straight into Arrow columns, skipping
+    # the per-row Python object materialization of the DBAPI path.
+    import connectorx as _cx
+except ImportError:
+    _cx = None
+
+DAY_ORDER = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+_DAY_IDX = {day: idx for idx, day in enumerate(DAY_ORDER)}
+RISK_LABELS = ['🟢 Lower Risk', '🟡 Moderate Risk', '🟠 High Risk', '🔴 Critical']
+RISK_CUTS = np.array([70.0, 80.0, 90.0])
+
+# Every query filters on call_datetime and several then group on priority,
+# address or call_type; without these the server scans the full table per
+# loader. Applied once at engine init, idempotently.
+_INDEX_DDL = (
+    "CREATE INDEX ix_pc_dt ON police_calls (call_datetime)",
+    "CREATE INDEX ix_pc_dt_pri ON police_calls (call_datetime, priority)",
+    "CREATE INDEX ix_pc_dt_addr ON police_calls (call_datetime, address, priority)",
+    "CREATE INDEX ix_pc_dt_ct ON police_calls (call_datetime, call_type, priority)",
+)
+
+# Set once per engine by get_database_connection; the response-time loader
+# dispatches on it instead of letting the server parse, plan and reject the
+# percentile query on every cache miss.
+SUPPORTS_PERCENTILE_CONT = False
+
+def _supports_percentile_cont(version):
+    """PERCENTILE_CONT ships with MariaDB 10.3+; stock MySQL (8.x included) lacks it."""
+    if 'MariaDB' not in version:
+        return False
+    try:
+        major, minor = (int(part) for part in version.split('.')[:2])
+    except ValueError:
+        return False
+    return (major, minor) >= (10, 3)
+
+def _database_url():
+    """Connection URL from Streamlit secrets, else the environment."""
+    try:
+        return st.secrets["database"]["url"]
+    except (KeyError, FileNotFoundError):
+        return os.environ.get("DATABASE_URL")
+
+@st.cache_resource(show_spinner=False)
+def get_database_connection():
+    """Pooled SQLAlchemy engine shared across sessions, or None if unconfigured.
+
+    A QueuePool-backed engine instead of a single cached pymysql socket:
+    concurrent sessions check out live connections in O(1), pre-ping
+    replaces connections the server dropped, and pd.read_sql can run the
+    seven loaders on separate connections when they fan out.
+    """
+    url = _database_url()
+    if not url:
+        return None
+    engine = sqlalchemy.create_engine(
+        url,
+        pool_size=8,
+        max_overflow=16,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
+    global SUPPORTS_PERCENTILE_CONT
+    with engine.connect() as conn:
+        version = conn.execute(sqlalchemy.text("SELECT VERSION()")).scalar() or ''
+        # MySQL has no CREATE INDEX IF NOT EXISTS; a duplicate index name
+        # raises errno 1061, which — like a missing INDEX privilege on a
+        # read-only account — is swallowed so the dashboard still loads.
+        for ddl in _INDEX_DDL:
+            try:
+                conn.execute(sqlalchemy.text(ddl))
+            except sqlalchemy.exc.DatabaseError:
+                conn.rollback()
+    SUPPORTS_PERCENTILE_CONT = _supports_percentile_cont(version)
+    return engine
+
+def _date_literal(value):
+    """Safely inline a date/datetime parameter for drivers without binding."""
+    return "'%s'" % pd.Timestamp(value).strftime('%Y-%m-%d %H:%M:%S')
+
+def _read_prepared(query, conn, start_date, end_date):
+    """Run a query through a server-side prepared statement.
+
+    Each statement is PREPAREd once per pooled DBAPI connection (tracked
+    in connection.info, which lives as long as the underlying socket) and
+    re-EXECUTEd on later cache misses, skipping the server's parse and
+    plan step — a measurable slice of the CTE-heavy risk and chain
+    queries. :start/:end are rewritten to the @s/@e session variables so
+    EXECUTE needs no placeholder list and repeated parameters stay in
+    sync.
+    """
+    prepared = conn.info.setdefault('prepared_statements', {})
+    name = prepared.get(query)
+    if name is None:
+        name = 'stmt_%d' % len(prepared)
+        sql = query.replace(':start', '@s').replace(':end', '@e')
+        conn.exec_driver_sql('PREPARE %s FROM %%s' % name, (sql,))
+        prepared[query] = name
+    conn.exec_driver_sql('SET @s = %s, @e = %s', (start_date, end_date))
+    result = conn.exec_driver_sql('EXECUTE %s' % name)
+    return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+def _read(query, conn, start_date, end_date):
+    # connectorx can only open its own connections, so it applies to the
+    # standalone loaders (handed the engine), not to load_all's temp-table
+    # connection, and it takes no bind parameters — the two date literals
+    # are formatted and quoted here.
+    if _cx is not None and isinstance(conn, sqlalchemy.engine.Engine):
+        sql = (query.replace(':start', _date_literal(start_date))
+                    .replace(':end', _date_literal(end_date)))
+        # connectorx needs the bare backend scheme (it rejects
+        # 'mysql+pymysql://') and the real password, which str(engine.url)
+        # masks as '***'.
+        url = (conn.url.set(drivername=conn.url.get_backend_name())
+                       .render_as_string(hide_password=False))
+        try:
+            return _cx.read_sql(url, sql, return_type='arrow').to_pandas()
+        except Exception:
+            # An optional accelerator must never take the page down;
+            # fall through to the pd.read_sql path below.
+            pass
+    # load_all hands its temp-table Connection here; the standalone
+    # loaders pass the Engine and take the pd.read_sql path below.
+    if isinstance(conn, sqlalchemy.engine.Connection):
+        return _read_prepared(query, conn, start_date, end_date)
+    return pd.read_sql(sqlalchemy.text(query), conn,
+                       params={'start': start_date, 'end': end_date})
+
+# Query templates. {table} is either police_calls or the pre-filtered
+# temporary table built by load_all; the date predicate is kept in both
+# cases (it is a no-op on the already-filtered rows).
+MONTHLY_SQL = """
+    SELECT month, calls, severe_calls,
+           SUM(calls) OVER (ORDER BY month) AS running_total,
+           ROUND(100.0 * (calls - LAG(calls) OVER (ORDER BY month))
+                 / NULLIF(LAG(calls) OVER (ORDER BY month), 0),
+                 2) AS pct_change,
+           SUM(days_in_month) OVER () AS n_days
+    FROM (
+        SELECT DATE_FORMAT(call_datetime, '%Y-%m-01') AS month,
+               COUNT(*) AS calls,
+               SUM(priority <= 2) AS severe_calls,
+               COUNT(DISTINCT DATE(call_datetime)) AS days_in_month
+        FROM {table}
+        WHERE call_datetime BETWEEN :start AND :end
+        GROUP BY month
+    ) m
+    ORDER BY month
+"""
+
+CALL_TYPE_SQL = """
+    SELECT call_type,
+           COUNT(*) AS total_calls,
+           AVG(priority) AS avg_priority,
+           SUM(priority <= 2) AS severe_count
+    FROM {table}
+    WHERE call_datetime BETWEEN :start AND :end
+    GROUP BY call_type
+    ORDER BY total_calls DESC
+    LIMIT 10
+"""
+
+HEATMAP_SQL = """
+    SELECT HOUR(call_datetime) AS hour,
+           DAYNAME(call_datetime) AS day,
+           COUNT(*) AS calls
+    FROM {table}
+    WHERE call_datetime BETWEEN :start AND :end
+    GROUP BY hour, day
+"""
+
+RISK_SQL = """
+    SELECT address,
+           COUNT(*) AS total_calls,
+           SUM(priority <= 2) AS severe_calls,
+           DATEDIFF(:end, MAX(call_datetime)) AS days_since_last
+    FROM {table}
+    WHERE call_datetime BETWEEN :start AND :end
+    GROUP BY address
+    ORDER BY total_calls DESC
+    LIMIT 25
+"""
+
+RESPONSE_BASE_SQL = """
+    SELECT call_type,
+           TIMESTAMPDIFF(MINUTE, call_datetime, dispatch_datetime) AS response_min
+    FROM {table}
+    WHERE call_datetime BETWEEN :start AND :end
+      AND dispatch_datetime IS NOT NULL
+"""
+
+RESPONSE_PERCENTILE_SQL = """
+    SELECT DISTINCT call_type,
+           PERCENTILE_CONT(0.50) WITHIN GROUP (ORDER BY response_min)
+               OVER (PARTITION BY call_type) AS p50,
+           PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY response_min)
+               OVER (PARTITION BY call_type) AS p75,
+           PERCENTILE_CONT(0.90) WITHIN GROUP (ORDER BY response_min)
+               OVER (PARTITION BY call_type) AS p90,
+           PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY response_min)
+               OVER (PARTITION BY call_type) AS p95,
+           COUNT(*) OVER (PARTITION BY call_type) AS total_calls
+    FROM (""" + RESPONSE_BASE_SQL + """) t
+    ORDER BY total_calls DESC
+    LIMIT 8
+"""
+
+PARETO_SQL = """
+    SELECT address, calls,
+           ROW_NUMBER() OVER w AS `rank`,
+           SUM(calls) OVER w AS cumulative_calls,
+           100.0 * SUM(calls) OVER w / SUM(calls) OVER () AS cumulative_pct
+    FROM (
+        SELECT address, COUNT(*) AS calls
+        FROM {table}
+        WHERE call_datetime BETWEEN :start AND :end
+        GROUP BY address
+    ) t
+    WINDOW w AS (ORDER BY calls DESC ROWS UNBOUNDED PRECEDING)
+    ORDER BY calls DESC
+    LIMIT 50
+"""
+
+# {table} appears exactly once; MySQL cannot open the same temporary
+# table twice in one statement, so the 24-hour window is taken from the
+# chains CTE rather than a second scan.
+CHAIN_SQL = """
+    WITH ordered AS (
+        SELECT address, call_datetime, priority,
+               LAG(call_datetime) OVER (
+                   PARTITION BY address ORDER BY call_datetime) AS prev_dt
+        FROM {table}
+        WHERE call_datetime BETWEEN :start AND :end
+    ),
+    chains AS (
+        SELECT address, priority, call_datetime,
+               SUM(prev_dt IS NULL
+                   OR call_datetime > prev_dt + INTERVAL 24 HOUR) OVER (
+                   PARTITION BY address ORDER BY call_datetime) AS chain_id
+        FROM ordered
+    ),
+    per_chain AS (
+        SELECT address, chain_id,
+               COUNT(*) AS chain_length,
+               MIN(priority) AS highest_priority
+        FROM chains
+        GROUP BY address, chain_id
+    ),
+    recent AS (
+        SELECT address, COUNT(*) AS incidents_24h
+        FROM chains
+        WHERE call_datetime > :end - INTERVAL 24 HOUR
+        GROUP BY address
+    )
+    SELECT r.address, r.incidents_24h, c.chain_length, c.highest_priority
+    FROM recent r
+    JOIN (
+        SELECT address,
+               MAX(chain_length) AS chain_length,
+               MIN(highest_priority) AS highest_priority
+        FROM per_chain
+        GROUP BY address
+    ) c USING (address)
+    ORDER BY r.incidents_24h DESC
+    LIMIT 10
+"""
+
+def _monthly(conn, start_date, end_date, table):
+    df = _read(MONTHLY_SQL.format(table=table), conn, start_date, end_date)
+    df['month'] = pd.to_datetime(df['month'])
+    # The first month has no LAG value; NULL would poison the KPI mean.
+    df['pct_change'] = df['pct_change'].fillna(0)
+    return df.astype({
+        'calls': 'int32', 'severe_calls': 'int32',
+        'running_total': 'int32', 'pct_change': 'float32',
+        'n_days': 'int16'})
+
+def _call_types(conn, start_date, end_date, table):
+    df = _read(CALL_TYPE_SQL.format(table=table), conn, start_date, end_date)
+    return df.astype({'call_type': 'category', 'total_calls': 'int32',
+                      'avg_priority': 'float32', 'severe_count': 'int32'})
+
+def _heatmap(conn, start_date, end_date, table):
+    df = _read(HEATMAP_SQL.format(table=table), conn, start_date, end_date)
+    # Scatter the (at most 168) grouped rows straight into the 24x7 matrix;
+    # missing hour/day cells simply stay zero.
+    z = np.zeros((24, 7), dtype=np.int32)
+    z[df['hour'].to_numpy(dtype=np.intp),
+      df['day'].map(_DAY_IDX).to_numpy(dtype=np.intp)] = df['calls'].to_numpy()
+    return z, DAY_ORDER, tuple(range(24))
+
+def _risk(conn, start_date, end_date, table):
+    df = _read(RISK_SQL.format(table=table), conn, start_date, end_date)
+    df['risk_score'] = (50.0
+                        + 0.10 * df['total_calls']
+                        + 0.50 * df['severe_calls']
+                        - 1.50 * df['days_since_last']).clip(0, 100)
+    df = df.sort_values('risk_score', ascending=False)
+    # One binary search per row straight into int8 categorical codes;
+    # pd.cut would build an IntervalIndex and box through object dtype.
+    codes = np.searchsorted(RISK_CUTS, df['risk_score'].to_numpy())
+    df['risk_category'] = pd.Categorical.from_codes(codes, RISK_LABELS)
+    return df.astype({'total_calls': 'int32', 'severe_calls': 'int32',
+                      'days_since_last': 'int16', 'risk_score': 'float32'})
+
+def _response_times(conn, start_date, end_date, table):
+    if SUPPORTS_PERCENTILE_CONT:
+        df = _read(RESPONSE_PERCENTILE_SQL.format(table=table),
+                   conn, start_date, end_date)
+    else:
+        raw = _read(RESPONSE_BASE_SQL.format(table=table),
+                    conn, start_date, end_date)
+        if raw.empty:
+            # unstack() on an empty groupby yields a (0, 0) frame and the
+            # column assignment below would raise a length mismatch.
+            df = pd.DataFrame(columns=['call_type', 'p50', 'p75',
+                                       'p90', 'p95', 'total_calls'])
+        else:
+            grouped = raw.groupby('call_type')['response_min']
+            df = grouped.quantile([0.50, 0.75, 0.90, 0.95]).unstack()
+            df.columns = ['p50', 'p75', 'p90', 'p95']
+            df['total_calls'] = grouped.size()
+            df = (df.sort_values('total_calls', ascending=False)
+                    .head(8).reset_index())
+    return df.astype({'call_type': 'category', 'p50': 'float32',
+                      'p75': 'float32', 'p90': 'float32', 'p95': 'float32',
+                      'total_calls': 'int32'})
+
+def _pareto(conn, start_date, end_date, table):
+    df = _read(PARETO_SQL.format(table=table), conn, start_date, end_date)
+    return df.astype({'calls': 'int32', 'rank': 'int32',
+                      'cumulative_calls': 'int32', 'cumulative_pct': 'float32'})
+
+def _chains(conn, start_date, end_date, table):
+    df = _read(CHAIN_SQL.format(table=table), conn, start_date, end_date)
+    return df.astype({'incidents_24h': 'int32', 'chain_length': 'int32',
+                      'highest_priority': 'int8'})
+
+_DATASETS = {
+    'monthly': _monthly,
+    'call_types': _call_types,
+    'heatmap': _heatmap,
+    'risk': _risk,
+    'response': _response_times,
+    'pareto': _pareto,
+    'chains': _chains,
+}
+
+# Shared cache settings for the loaders: dates hash by ordinal
+# instead of going through Streamlit's generic object hasher.
+_LOADER_CACHE = dict(ttl=300, show_spinner=False,
+                     hash_funcs={date: lambda d: d.toordinal()})
+
+# A memoized st.cache_data return never touches the network, so any call
+# finishing under this is counted as a cache hit; real queries take far
+# longer even against a warm server.
+_HIT_THRESHOLD_MS = 5.0
+
+# Per-loader counters at module level (the same lifetime pattern as
+# conn.info): the ThreadPool fallback runs loaders in worker threads,
+# where st.session_state resolves to a throwaway object without a script
+# run context and writes vanish. A plain dict is visible from any thread
+# and, like the caches it describes, shared across sessions.
+CACHE_STATS = {}
+
+def _record_timing(fn):
+    """Record hits, misses and last execution time for a cached loader.
+
+    Streamlit exposes no per-function cache metrics, so this wraps the
+    cached callable and keeps counters in CACHE_STATS, which the sidebar
+    renders. The cached function's .clear() is preserved.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        stats = CACHE_STATS.setdefault(
+            name, {'hits': 0, 'misses': 0, 'last_exec_ms': 0.0})
+        stats['hits' if elapsed_ms < _HIT_THRESHOLD_MS else 'misses'] += 1
+        stats['last_exec_ms'] = elapsed_ms
+        return result
+
+    wrapper.clear = fn.clear
+    return wrapper
+
+@_record_timing
+@st.cache_data(**_LOADER_CACHE)
+def load_all(_engine, start_date, end_date):
+    """All seven datasets off a single scan of police_calls.
+
+    Materializes the date-filtered rows into an in-memory temporary table
+    and runs every aggregate against it on one connection: same results
+    as the standalone loaders, minus six base-table scans and six network
+    round-trips of setup.
+    """
+    with _engine.connect() as conn:
+        conn.execute(sqlalchemy.text("DROP TEMPORARY TABLE IF EXISTS filtered"))
+        conn.execute(sqlalchemy.text("""
+            CREATE TEMPORARY TABLE filtered ENGINE=MEMORY AS
+            SELECT call_datetime, priority, call_type, address, dispatch_datetime
+            FROM police_calls
+            WHERE call_datetime BETWEEN :start AND :end
+        """), {'start': start_date, 'end': end_date})
+        return {name: fn(conn, start_date, end_date, 'filtered')
+                for name, fn in _DATASETS.items()}
+
+@_record_timing
+@st.cache_data(**_LOADER_CACHE)
+def load_monthly_data(_conn, start_date, end_date):
+    """Monthly call volumes with running totals, month-over-month change
+    and the number of distinct active days (n_days) for daily averages."""
+    return _monthly(_conn, start_date, end_date, 'police_calls')
+
+@_record_timing
+@st.cache_data(**_LOADER_CACHE)
+def load_call_type_data(_conn, start_date, end_date):
+    """Call volume, mean priority and severe counts per call type."""
+    return _call_types(_conn, start_date, end_date, 'police_calls')
+
+@_record_timing
+@st.cache_data(**_LOADER_CACHE)
+def load_heatmap_data(_conn, start_date, end_date):
+    """Hour-by-day call counts as a plot-ready (24, 7) matrix plus axes."""
+    return _heatmap(_conn, start_date, end_date, 'police_calls')
+
+@_record_timing
+@st.cache_data(**_LOADER_CACHE)
+def load_risk_data(_conn, start_date, end_date):
+    """Top locations scored by volume, severity and recency."""
+    return _risk(_conn, start_date, end_date, 'police_calls')
+
+@_record_timing
+@st.cache_data(**_LOADER_CACHE)
+def load_response_time_data(_conn, start_date, end_date):
+    """Dispatch response-time percentiles per call type."""
+    return _response_times(_conn, start_date, end_date, 'police_calls')
+
+@_record_timing
+@st.cache_data(**_LOADER_CACHE)
+def load_pareto_data(_conn, start_date, end_date):
+    """Top-50 locations by call count with cumulative concentration."""
+    return _pareto(_conn, start_date, end_date, 'police_calls')
+
+@_record_timing
+@st.cache_data(**_LOADER_CACHE)
+def load_incident_chain_data(_conn, start_date, end_date):
+    """Locations with cascading incidents: 24h volume and longest chain.
+
+    A chain is a run of calls at one address with gaps under 24 hours.
+    """
+    return _chains(_conn, start_date, end_date, 'police_calls')